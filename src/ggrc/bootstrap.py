@@ -72,6 +72,8 @@ def get_db():  # noqa
         del flask.g.user_cache
       if hasattr(flask.g, "user_creator_roles_cache"):
         del flask.g.user_creator_roles_cache
+      if hasattr(flask.g, "column_definitions_cache"):
+        del flask.g.column_definitions_cache
       from ggrc.models.hooks import acl
       acl.after_commit()
 
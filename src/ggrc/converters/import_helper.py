@@ -3,7 +3,6 @@
 
 import csv
 import logging
-from StringIO import StringIO
 import chardet
 
 from flask import g
@@ -20,6 +19,9 @@ from ggrc.converters.handlers import handlers
 # pylint: disable=invalid-name
 logger = logging.getLogger(__name__)
 
+CSV_LINE_TERMINATOR = "\r\n"
+CSV_SPECIAL_CHARS = ',"' + CSV_LINE_TERMINATOR
+
 
 def get_object_column_definitions(object_class, fields=None):
   """Attach additional info to attribute definitions.
@@ -28,6 +30,11 @@ def get_object_column_definitions(object_class, fields=None):
   additional data (handler class, validator function, default value) )needed
   for imports.
 
+  Definitions are cached in flask.g until the next commit. Import blocks
+  commit at their end, so only blocks of the same type in an export or in a
+  dry run import reuse cached definitions instead of repeating the model
+  reflection and custom attribute queries.
+
   Args:
     object_class (db.Model): Model for which we want to get column definitions
       for imports.
@@ -35,6 +42,21 @@ def get_object_column_definitions(object_class, fields=None):
   Returns:
     dict: Updated attribute definitions dict with additional data.
   """
+  if not hasattr(g, "column_definitions_cache"):
+    g.column_definitions_cache = {}
+  cache_key = (object_class, None if fields is None else frozenset(fields))
+  if cache_key not in g.column_definitions_cache:
+    g.column_definitions_cache[cache_key] = _get_object_column_definitions(
+        object_class, fields)
+  # copy definitions so that callers can not spoil cached values
+  return {
+      key: dict(attr)
+      for key, attr in g.column_definitions_cache[cache_key].iteritems()
+  }
+
+
+def _get_object_column_definitions(object_class, fields=None):
+  """Gather attribute definitions with import data for object_class."""
   attributes = AttributeInfo.get_object_attr_definitions(object_class,
                                                          fields=fields)
   column_handlers = model_column_handlers(object_class)
@@ -64,45 +86,51 @@ def get_column_order(columns):
   return AttributeInfo.get_column_order(columns)
 
 
-def generate_csv_string(csv_data):
-  """ Turn 2d string array into a string representing a csv file """
-  output_buffer = StringIO()
-  writer = csv.writer(output_buffer)
+def _quote_cell(value):
+  """Quote utf-8 encoded cell value the way csv.writer does by default."""
+  if len(value.translate(None, CSV_SPECIAL_CHARS)) == len(value):
+    return value
+  return '"' + value.replace('"', '""') + '"'
 
-  csv_data = equalize_array(csv_data)
-  csv_data = utf_8_encode_array(csv_data)
 
-  for row in csv_data:
-    writer.writerow(row)
+def _encode_csv_row(row, width):
+  """Encode and quote a single row, padding it with empty cells to width."""
+  line = ",".join(_quote_cell(val.encode("utf-8")) for val in row)
+  diff = width - len(row)
+  if diff:
+    line += "," * (diff if row else diff - 1)
+  if width == 1 and not line:
+    # csv module quotes a lone empty field to distinguish it from empty row
+    line = '""'
+  return line
 
-  body = output_buffer.getvalue()
-  output_buffer.close()
-  return body
+
+def generate_csv_string(csv_data):
+  """ Turn 2d string array into a string representing a csv file """
+  max_length = max(len(row) for row in csv_data) if csv_data else 0
+  return "".join(
+      _encode_csv_row(row, max_length) + CSV_LINE_TERMINATOR
+      for row in csv_data
+  )
 
 
 def extract_relevant_data(csv_data):
-  """ Split csv data into data and metadata """
+  """ Split csv data into data and metadata
+
+  The first line and the first non empty column are skipped, as well as
+  all empty columns and cells of columns not present in every line.
+  """
   striped_data = [[unicode.strip(c) for c in line]
-                  for line in csv_data]  # noqa
-  transpose_data = zip(*striped_data[1:])
-  non_empty = [d for d in transpose_data if any(d)]
-  data = zip(*non_empty[1:])
-  column_definitions = list(data.pop(0))
-  data = [list(d) for d in data]
+                  for line in csv_data[1:]]  # noqa
+  width = min(len(line) for line in striped_data) if striped_data else 0
+  non_empty = [i for i in xrange(width)
+               if any(line[i] for line in striped_data)]
+  relevant = non_empty[1:]
+  column_definitions = [striped_data[0][i] for i in relevant]
+  data = [[line[i] for i in relevant] for line in striped_data[1:]]
   return column_definitions, data
 
 
-def equalize_array(array):
-  """ Expand all rows of 2D array to the same length """
-  if len(array) == 0:
-    return array
-  max_length = max([len(i) for i in array])
-  for row in array:
-    diff = max_length - len(row)
-    row.extend([""] * diff)
-  return array
-
-
 def split_blocks(csv_data):
   """Split array by empty lines and skip blocks shorter than 2 lines."""
 
@@ -141,26 +169,16 @@ def split_array(csv_data):
     yield current_offset, current_block, current_csv_lines
 
 
-def generate_2d_array(width, height, value=None):
-  """ Generate 2D array of size width x height """
-  return [[value for _ in range(width)] for _ in range(height)]
-
-
 def csv_reader(csv_data, dialect=csv.excel, **kwargs):
   """ Reader for csv files """
   reader = csv.reader(utf_8_encoder(csv_data), dialect=dialect, **kwargs)
   for row in reader:
-    yield [unicode(cell, 'utf-8') for cell in row]  # noqa
+    yield [cell.decode('utf-8') for cell in row]
 
 
 def read_csv_file(csv_file):
   """ Get full string representation of the csv file """
-  return [row for row in csv_reader(csv_file)]
-
-
-def utf_8_encode_array(array):
-  """ encode 2D array to utf8 """
-  return [[val.encode("utf-8") for val in line] for line in array]
+  return list(csv_reader(csv_file))
 
 
 def utf_8_encoder(csv_data):
@@ -174,10 +192,12 @@ def utf_8_encoder(csv_data):
   """
   for line in csv_data:
     try:
-      yield line.decode('utf-8').encode('utf-8')
+      # valid utf-8 lines are passed as is, decoding only validates them
+      line.decode('utf-8')
     except UnicodeDecodeError:
       encoding_guess = chardet.detect(line)['encoding']
-      yield line.decode(encoding_guess).encode('utf-8')
+      line = line.decode(encoding_guess).encode('utf-8')
+    yield line
 
 
 def count_objects(csv_data):
@@ -254,14 +274,7 @@ class CsvStringBuilder(object):
   def __init__(self, table_width):
     """Basic initialization."""
     self.table_width = table_width
-
-    self.output_buffer = StringIO()
-    self.csv_writer = csv.writer(self.output_buffer)
-
-  @staticmethod
-  def _utf_8_encode_line(line):
-    """Encode line to utf8."""
-    return [val.encode("utf-8") for val in line]
+    self.lines = []
 
   def append_line(self, line):
     """Append line to CSV buffer."""
@@ -270,11 +283,10 @@ class CsvStringBuilder(object):
                       "Line length greater than table width. ({} > {})".
                       format(len(line), self.table_width))
 
-    line = self._utf_8_encode_line(line)
-    diff = self.table_width - len(line)
-    line.extend([""] * diff)
-    self.csv_writer.writerow(line)
+    self.lines.append(
+        _encode_csv_row(line, self.table_width) + CSV_LINE_TERMINATOR
+    )
 
   def get_csv_string(self):
     """Returns CSV string from buffer."""
-    return self.output_buffer.getvalue()
+    return "".join(self.lines)
@@ -5,6 +5,7 @@
 
 import flask
 from sqlalchemy import func
+from sqlalchemy import orm
 from sqlalchemy.ext.declarative import declared_attr
 from sqlalchemy.orm import validates
 from sqlalchemy.sql.schema import UniqueConstraint
@@ -29,8 +30,18 @@ def get_inflector_model_name_pairs():
           for m in all_models.all_models]
 
 
+_INFLECTOR_MODEL_NAMES = {}
+
+
 def get_inflector_model_name_dict():
-  return dict(get_inflector_model_name_pairs())
+  """Returns dict with definition_type to model_name association.
+
+  Models do not change at runtime, so the dict is only built on first call
+  instead of for every validated custom attribute definition.
+  """
+  if not _INFLECTOR_MODEL_NAMES:
+    _INFLECTOR_MODEL_NAMES.update(get_inflector_model_name_pairs())
+  return _INFLECTOR_MODEL_NAMES
 
 
 class CustomAttributeDefinition(attributevalidator.AttributeValidator,
@@ -342,7 +353,11 @@ def _get_query_for(definition_type, instance_id=None):
   """Returns query for sent args if """
   if not get_cads_counts().get((definition_type, instance_id is None)):
     return []
-  query = CustomAttributeDefinition.query.filter(
+  # results are serialized with log_json, which reads all the columns, so
+  # deferred ones are loaded here instead of one query per definition
+  query = CustomAttributeDefinition.query.options(
+      orm.undefer_group("CustomAttributeDefinition_complete"),
+  ).filter(
       CustomAttributeDefinition.definition_type == definition_type,
   )
   if instance_id is None:
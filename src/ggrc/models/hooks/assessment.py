@@ -8,9 +8,9 @@
   new relationships and custom attributes
 """
 import collections
-import itertools
 import logging
 
+import flask
 from sqlalchemy import orm
 
 from ggrc import db
@@ -39,26 +39,138 @@ def _validate_assessment_done_state(old_value, obj):
                                   "of items of self.custom_attribute_values")
 
 
-def _handle_assessment(assessment, src):
-  """Handles auto calculated properties for Assessment model."""
+def _warmup_snapshots(snapshot_ids):
+  """Put snapshots with their revisions into referenced objects cache.
+
+  Snapshots are loaded apart from other referenced objects to populate their
+  revisions in the same query.
+  """
+  if not hasattr(flask.g, "referenced_objects"):
+    flask.g.referenced_objects = {}
+  cached_snapshots = flask.g.referenced_objects.setdefault(
+      all_models.Snapshot, {}
+  )
+  for snapshot in all_models.Snapshot.query.options(
+      orm.undefer_group("Snapshot_complete"),
+      orm.joinedload("revision"),
+  ).filter(
+      all_models.Snapshot.id.in_(snapshot_ids)
+  ):
+    cached_snapshots[snapshot.id] = snapshot
+
+
+def _load_templates_cads(template_ids):
+  """Load local custom attribute definitions of assessment templates.
+
+  Returns:
+    dict of custom attribute definition lists ordered by id by template id.
+  """
+  templates_cads = {template_id: [] for template_id in template_ids}
+  cad = all_models.CustomAttributeDefinition
+  for definition in cad.query.options(
+      orm.undefer_group('CustomAttributeDefinition_complete'),
+  ).filter(
+      cad.definition_type == "assessment_template",
+      cad.definition_id.in_(template_ids),
+  ).order_by(
+      cad.id
+  ):
+    templates_cads[definition.definition_id].append(definition)
+  return templates_cads
+
+
+def _warmup_referenced_objects(sources):
+  """Load objects referenced by sources in bulk.
+
+  Audits, templates and snapshots are already put into referenced objects
+  cache by collection POST. Snapshot revisions with deferred columns, audit
+  people and template custom attribute definitions are loaded here at once,
+  so that per assessment handling does not query them one by one. Only
+  sources of generated assessments or assessments created for a snapshot are
+  handled.
+
+  Returns:
+    dict of template custom attribute definition lists by template id.
+  """
+  sources = [
+      src for src in sources
+      if src.get("_generated") or
+      (src.get("object") or {}).get("id") is not None
+  ]
+  if not sources:
+    return {}
+
+  audit_ids = set()
+  template_ids = set()
+  snapshot_ids = set()
+  for src in sources:
+    audit_id = (src.get("audit") or {}).get("id")
+    if audit_id is not None:
+      audit_ids.add(audit_id)
+    template_id = (src.get("template") or {}).get("id")
+    if template_id is not None:
+      template_ids.add(template_id)
+    snapshot_id = (src.get("object") or {}).get("id")
+    if snapshot_id is not None:
+      snapshot_ids.add(snapshot_id)
+
+  if snapshot_ids:
+    _warmup_snapshots(snapshot_ids)
+
+  if audit_ids:
+    # populate access control lists of the cached audits with their people
+    # using one joined query
+    all_models.Audit.query.options(
+        orm.joinedload(
+            "_access_control_list"
+        ).joinedload(
+            "access_control_people"
+        ).joinedload(
+            "person"
+        ).undefer_group(
+            "Person_complete"
+        ),
+    ).filter(
+        all_models.Audit.id.in_(audit_ids)
+    ).all()
+
+  return _load_templates_cads(template_ids) if template_ids else {}
+
+
+def _handle_assessment(assessment, src, current_user_id, templates_cads):
+  """Handles auto calculated properties for Assessment model.
+
+  Args:
+    assessment: Assessment instance to handle.
+    src: POSTed JSON dictionary of the assessment.
+    current_user_id: id of the user that creates the assessment.
+    templates_cads: dict of template custom attribute definition lists by
+      template id.
+  """
   snapshot_dict = src.get('object') or {}
   common.map_objects(assessment, snapshot_dict)
   common.map_objects(assessment, src.get('audit'))
-  snapshot = referenced_objects.get("Snapshot", snapshot_dict.get('id'))
 
-  if not src.get('_generated') and not snapshot:
+  is_generated = src.get('_generated')
+  if not is_generated and snapshot_dict.get('id') is None:
+    # Assessment is neither generated nor created for a snapshot
+    return
+  snapshot = referenced_objects.get("Snapshot", snapshot_dict.get('id'))
+  if not is_generated and not snapshot:
     return
 
+  template_src = src.get('template', {})
   template = referenced_objects.get(
-      src.get('template', {}).get('type'),
-      src.get('template', {}).get('id'),
+      template_src.get('type'),
+      template_src.get('id'),
   )
   audit = referenced_objects.get(
       src['audit']['type'],
       src['audit']['id'],
   )
-  relate_assignees(assessment, snapshot, template, audit)
-  relate_ca(assessment, template)
+  relate_assignees(assessment, snapshot, template, audit, current_user_id)
+  relate_ca(assessment, template,
+            templates_cads.get(template.id) if template else None)
   assessment.title = u'{} assessment for {}'.format(
       snapshot.revision.content['title'],
       audit.title,
@@ -96,14 +208,18 @@ def init_hook():
 
     db.session.flush()
 
-    for assessment, src in itertools.izip(objects, sources):
-      _handle_assessment(assessment, src)
+    templates_cads = _warmup_referenced_objects(sources)
+    current_user_id = get_current_user_id()
+    assessments_with_src = zip(objects, sources)
+    for assessment, src in assessments_with_src:
+      _handle_assessment(assessment, src, current_user_id, templates_cads)
 
-    # Flush roles objects for generated assessments.
+    # Flush roles objects for generated assessments. Issue tracker handling
+    # relies on the flushed roles, so it can't be done in the loop above.
     db.session.flush()
 
     tracker_handler = assessment_integration.AssessmentTrackerHandler()
-    for assessment, src in itertools.izip(objects, sources):
+    for assessment, src in assessments_with_src:
       # Handling IssueTracker info here rather than in hooks/issue_tracker
       # would avoid querying same data (such as snapshots, audits and
       # templates) twice.
@@ -142,7 +258,10 @@ def generate_assignee_relations(assessment,
         verifier_ids (list): list of person ids
         creator_ids (list): list of person ids
   """
-  people = set(assignee_ids + verifier_ids + creator_ids)
+  assignee_ids = frozenset(assignee_ids)
+  verifier_ids = frozenset(verifier_ids)
+  creator_ids = frozenset(creator_ids)
+  people = assignee_ids | verifier_ids | creator_ids
   person_dict = {i.id: i for i in all_models.Person.query.filter(
       all_models.Person.id.in_(people)
   )}
@@ -151,7 +270,7 @@ def generate_assignee_relations(assessment,
     person = person_dict.get(person_id)
     if person is None:
       continue
-    if person.id in assignee_ids:
+    if person_id in assignee_ids:
       assessment.add_person_with_role_name(person, "Assignees")
     if person_id in verifier_ids:
       assessment.add_person_with_role_name(person, "Verifiers")
@@ -180,15 +299,15 @@ def generate_role_object_dict(snapshot, audit):
 
   acr_dict = access_control.role.get_custom_roles_for(snapshot.child_type)
   audit_acr = access_control.role.get_custom_roles_for("Audit")
-  auditors_role = next(id_ for id_, val in audit_acr.iteritems()
-                       if val == "Auditors")
-  leads_role = next(id_ for id_, val in audit_acr.iteritems()
-                    if val == "Audit Captains")
+  audit_role_ids = {name: id_ for id_, name in audit_acr.iteritems()}
+  auditors_role = audit_role_ids["Auditors"]
+  leads_role = audit_role_ids["Audit Captains"]
 
   acl_dict = collections.defaultdict(list)
+  get_role_name = acr_dict.get
   # populated content should have access_control_list
   for acl in snapshot.revision.content["access_control_list"]:
-    acr = acr_dict.get(acl["ac_role_id"])
+    acr = get_role_name(acl["ac_role_id"])
     if not acr:
       # This can happen when we try to create an assessment for a control that
       # had a custom attribute role removed. This can not cause a bug as we
@@ -202,18 +321,21 @@ def generate_role_object_dict(snapshot, audit):
     acl_dict[acr].append(acl["person_id"])
 
   # populate Access Control List by generated role from the related Audit
-  acl_dict["Audit Lead"].extend([person.id
-                                 for person, acl in audit.access_control_list
-                                 if acl.ac_role_id == leads_role])
-  auditors = [
-      person.id for person, acl in audit.access_control_list
-      if acl.ac_role_id == auditors_role
-  ]
+  leads = []
+  auditors = []
+  for person, acl in audit.access_control_list:
+    role_id = acl.ac_role_id
+    if role_id == leads_role:
+      leads.append(person.id)
+    elif role_id == auditors_role:
+      auditors.append(person.id)
+  acl_dict["Audit Lead"].extend(leads)
   acl_dict["Auditors"].extend(auditors or acl_dict["Audit Lead"])
   return acl_dict
 
 
-def relate_assignees(assessment, snapshot, template, audit):
+def relate_assignees(assessment, snapshot, template, audit,
+                     current_user_id=None):
   """Generates assignee list and relates them to Assessment objects
 
     Args:
@@ -221,7 +343,11 @@ def relate_assignees(assessment, snapshot, template, audit):
         snapshot (model instance): Snapshot,
         template (model instance): AssessmentTemplate model nullable,
         audit (model instance): Audit
+        current_user_id (int): id of the assessment creator, current user id
+          is used if not set
   """
+  if current_user_id is None:
+    current_user_id = get_current_user_id()
   if template:
     template_settings = template.default_people
   else:
@@ -239,27 +365,35 @@ def relate_assignees(assessment, snapshot, template, audit):
   generate_assignee_relations(assessment,
                               assignee_ids,
                               verifier_ids,
-                              [get_current_user_id()])
+                              [current_user_id])
+
 
+def get_template_cads(template):
+  """Get list of local custom attribute definitions of assessment template."""
+  return all_models.CustomAttributeDefinition.query.options(
+      orm.undefer_group('CustomAttributeDefinition_complete'),
+  ).filter_by(
+      definition_id=template.id,
+      definition_type="assessment_template",
+  ).order_by(
+      all_models.CustomAttributeDefinition.id
+  ).all()
 
-def relate_ca(assessment, template):
+
+def relate_ca(assessment, template, ca_definitions=None):
   """Generates custom attribute list and relates it to Assessment objects
 
     Args:
         assessment (model instance): Assessment model
         template: Assessment Temaplte instance (may be None)
+        ca_definitions: list of template custom attribute definitions, they
+          are queried if not set
   """
   if not template:
     return None
 
-  ca_definitions = all_models.CustomAttributeDefinition.query.options(
-      orm.undefer_group('CustomAttributeDefinition_complete'),
-  ).filter_by(
-      definition_id=template.id,
-      definition_type="assessment_template",
-  ).order_by(
-      all_models.CustomAttributeDefinition.id
-  )
+  if ca_definitions is None:
+    ca_definitions = get_template_cads(template)
   created_cads = []
   for definition in ca_definitions:
     cad = all_models.CustomAttributeDefinition(
@@ -3,7 +3,6 @@
 
 """Utilties to deal with introspecting GGRC models for publishing, creation,
 and update from resource format representations, such as JSON."""
-import bisect
 from collections import defaultdict
 
 import flask
@@ -181,6 +180,15 @@ class AttributeInfo(object):
       "issue_type",
   )
 
+  _ATTRIBUTE_ORDER_INDEX = dict(
+      (attr, idx) for idx, attr in enumerate(ATTRIBUTE_ORDER)
+  )
+  _PREFIX_ORDER_INDEX = dict(
+      ("__{}__".format(attr.split("__")[1]), idx)
+      for idx, attr in enumerate(ATTRIBUTE_ORDER)
+      if attr.startswith("__")
+  )
+
   class Type(object):
     """Types of model attributes."""
     # TODO: change to enum.
@@ -504,22 +512,33 @@ class AttributeInfo(object):
         ATTRIBUTE ORDER
       - mapping attributes are sorted alphabetically and placed last
     """
+    ordered_attrs = [None] * len(cls.ATTRIBUTE_ORDER)
     prefixed_attrs = defaultdict(list)
+    other_attrs = []
+    mapping_attrs = []
     for attr in attr_list:
-      if attr.startswith('__'):
-        bisect.insort(prefixed_attrs[cls._prefixed_attr_key(attr)], attr)
-    attr_set = set(attr_list)
-    ordered_attrs = []
-    for attr in cls.ATTRIBUTE_ORDER:
-      if attr in attr_set:
-        ordered_attrs.append(attr)
-      elif attr.startswith("__"):
-        ordered_attrs.extend(prefixed_attrs[cls._prefixed_attr_key(attr)])
-    ordered_set = set(ordered_attrs)
-    other_attrs = [v for v in attr_list if v not in ordered_set]
-    other_custom_attrs = [v for v in other_attrs
-                          if not v.lower().startswith("map:")]
-    mapping_attrs = [v for v in other_attrs if v.lower().startswith("map:")]
-    other_custom_attrs.sort(key=lambda x: x.lower())
+      idx = cls._ATTRIBUTE_ORDER_INDEX.get(attr)
+      if idx is not None:
+        ordered_attrs[idx] = attr
+        continue
+      if attr.startswith("__"):
+        idx = cls._PREFIX_ORDER_INDEX.get(cls._prefixed_attr_key(attr))
+        if idx is not None:
+          prefixed_attrs[idx].append(attr)
+          continue
+      if attr.lower().startswith("map:"):
+        mapping_attrs.append(attr)
+      else:
+        other_attrs.append(attr)
+
+    result = []
+    for idx, attr in enumerate(ordered_attrs):
+      if attr is not None:
+        result.append(attr)
+        # prefixed attributes are only grouped when the prefix itself is absent
+        other_attrs.extend(prefixed_attrs.get(idx, []))
+      elif idx in prefixed_attrs:
+        result.extend(sorted(prefixed_attrs[idx]))
+    other_attrs.sort(key=lambda x: x.lower())
     mapping_attrs.sort(key=lambda x: x.lower())
-    return ordered_attrs + other_custom_attrs + mapping_attrs
+    return result + other_attrs + mapping_attrs
@@ -28,6 +28,9 @@ logger = logging.getLogger()
 DATE_FORMAT_ISO = "%Y-%m-%d"
 DATE_FORMAT_US = "%m/%d/%Y"
 CHUNK_SIZE = 200
+_CAPITAL_LETTER_RE = re.compile(r'[A-Z]')
+
+_PREFIXED_CAMELCASE_CACHE = {}
 
 
 class GrcEncoder(json.JSONEncoder):
@@ -169,8 +172,17 @@ def get_url_root():
 
 
 def _prefix_camelcase(name, prefix):
-  name = name[:1].lower() + name[1:]
-  return re.sub(r'[A-Z]', lambda pat: prefix + pat.group(0).lower(), name)
+  """Lower all capital letters in name and prefix all but the first one.
+
+  Results are memoized since this is only used with a finite set of model
+  names.
+  """
+  key = (name, prefix)
+  if key not in _PREFIXED_CAMELCASE_CACHE:
+    lowered = name[:1].lower() + name[1:]
+    _PREFIXED_CAMELCASE_CACHE[key] = _CAPITAL_LETTER_RE.sub(
+        lambda pat: prefix + pat.group(0).lower(), lowered)
+  return _PREFIXED_CAMELCASE_CACHE[key]
 
 
 def underscore_from_camelcase(name):
@@ -168,6 +168,36 @@ class TestCustomAttributesDefinitions(TestCase):
     self.assertTrue(vals["Choose"]["mandatory"])
 
 
+class TestColumnDefinitionsCache(TestCase):
+  """Tests for caching of object column definitions."""
+
+  def test_cache_reset_on_commit(self):
+    """Test new custom attribute is present after commit."""
+    definitions = get_object_column_definitions(all_models.Policy)
+    display_names = {val["display_name"] for val in definitions.itervalues()}
+    self.assertNotIn("New Attribute", display_names)
+
+    with factories.single_commit():
+      factories.CustomAttributeDefinitionFactory(
+          definition_type="policy",
+          title="New Attribute",
+      )
+
+    definitions = get_object_column_definitions(all_models.Policy)
+    display_names = {val["display_name"] for val in definitions.itervalues()}
+    self.assertIn("New Attribute", display_names)
+
+  def test_cached_definitions_copied(self):
+    """Test changes of returned definitions do not affect the cache."""
+    definitions = get_object_column_definitions(all_models.Policy)
+    definitions["title"]["display_name"] = "Changed"
+    del definitions["description"]
+
+    definitions = get_object_column_definitions(all_models.Policy)
+    self.assertEqual(definitions["title"]["display_name"], "Title")
+    self.assertIn("description", definitions)
+
+
 # pylint: disable=too-many-public-methods
 @ddt.ddt
 class TestGetObjectColumnDefinitions(TestCase):
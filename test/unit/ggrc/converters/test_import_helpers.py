@@ -185,3 +185,50 @@ class TestModelColumntHandler(unittest.TestCase):
       self.assertEqual(
           {"col_a": test_custom_handler, "col_b": test_handler},
           model_column_handlers(test_custom_class))
+
+
+class TestCsvStringBuilder(unittest.TestCase):
+  """Tests for CSV string building."""
+
+  def test_quoting(self):
+    """Only cells with delimiters, quotes or line breaks are quoted."""
+    builder = import_helper.CsvStringBuilder(5)
+    builder.append_line([u"plain", u"a,b", u'say "hi"', u"two\nlines", u"\r"])
+    self.assertEqual(
+        builder.get_csv_string(),
+        'plain,"a,b","say ""hi""","two\nlines","\r"\r\n',
+    )
+
+  def test_utf_8_encoding(self):
+    """Cells are encoded to utf-8."""
+    builder = import_helper.CsvStringBuilder(2)
+    builder.append_line([u"\u0161", u" spaced "])
+    self.assertEqual(builder.get_csv_string(), "\xc5\xa1, spaced \r\n")
+
+  def test_padding(self):
+    """Short lines are padded with empty cells up to table width."""
+    builder = import_helper.CsvStringBuilder(3)
+    builder.append_line([u"a"])
+    builder.append_line([u"a", u"b", u"c"])
+    builder.append_line([])
+    self.assertEqual(builder.get_csv_string(), "a,,\r\na,b,c\r\n,,\r\n")
+
+  def test_lone_empty_field(self):
+    """Lone empty field is quoted the same way as csv module does it."""
+    builder = import_helper.CsvStringBuilder(1)
+    builder.append_line([u""])
+    builder.append_line([])
+    self.assertEqual(builder.get_csv_string(), '""\r\n""\r\n')
+
+  def test_too_long_line(self):
+    """Lines longer than table width are not allowed."""
+    builder = import_helper.CsvStringBuilder(1)
+    with self.assertRaises(Exception):
+      builder.append_line([u"a", u"b"])
+
+  def test_generate_csv_string(self):
+    """Rows of 2D array are padded to the longest one."""
+    self.assertEqual(
+        import_helper.generate_csv_string([[u"a", u"b,c"], [u""], []]),
+        'a,"b,c"\r\n,\r\n,\r\n',
+    )